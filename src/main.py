@@ -1,10 +1,31 @@
 from telegram_media_organizer.watcher import DirectoryWatcher
+from telegram_media_organizer.profiler import StackProfiler
+from telegram_media_organizer.throttle import CopyThrottle
 from pathlib import Path
 
 # Configuration
 DOWNLOAD_FOLDER = "D:/downloads/telegrzm download"
 DESTINATION_FOLDER = "D:/"
 
+# "move" empties the download folder, "link" keeps it (hardlinks/reflinks)
+ORGANIZE_MODE = "move"
+
+# Leave downloads the library index already has (same episode / movie title).
+# Off by default: it runs before safe_move, so a higher-resolution
+# re-download would never replace the library copy.
+SKIP_KNOWN = False
+
+# Copy bandwidth limits in bytes/s (None = unlimited)
+MB = 1024 * 1024
+COPY_RATE_LIMIT = None
+DEVICE_RATE_LIMITS = {}  # e.g. {"E:/": 50 * MB}
+TIME_WINDOW_LIMITS = []  # e.g. [(9, 23, 30 * MB)] -> (start_hour, end_hour, rate)
+BUSY_RATE_LIMIT = 20 * MB  # While downloads are still growing
+
+# Profiling: send SIGUSR1 or create this file to capture a report
+PROFILE_CONTROL_FILE = "profile.request"
+PROFILE_REPORT_DIR = "profiles"
+
 
 def main():
     # Create the download folder if it doesn't exist (simulated for safety)
@@ -13,7 +34,18 @@ def main():
     except Exception:
         pass
 
-    watcher = DirectoryWatcher(DOWNLOAD_FOLDER, DESTINATION_FOLDER)
+    profiler = StackProfiler(PROFILE_REPORT_DIR, PROFILE_CONTROL_FILE)
+    throttle = CopyThrottle(
+        COPY_RATE_LIMIT, DEVICE_RATE_LIMITS, TIME_WINDOW_LIMITS, BUSY_RATE_LIMIT
+    )
+    watcher = DirectoryWatcher(
+        DOWNLOAD_FOLDER,
+        DESTINATION_FOLDER,
+        profiler=profiler,
+        mode=ORGANIZE_MODE,
+        throttle=throttle,
+        skip_known=SKIP_KNOWN,
+    )
     watcher.start()
 
 
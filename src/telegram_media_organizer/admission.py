@@ -0,0 +1,91 @@
+import os
+import errno
+import shutil
+import threading
+from pathlib import Path
+
+
+class SpaceAdmission:
+    """
+    Track free space per destination filesystem and reserve room
+    for in-flight moves, so a copy never starts on a drive it can't finish on.
+    """
+
+    def __init__(self, headroom: int = 512 * 1024 * 1024):
+        self.headroom = headroom  # Bytes always left free on the drive
+
+        # State: st_dev -> bytes reserved by moves still copying
+        self.reserved = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def free_bytes(folder: Path) -> int:
+        """
+        Free bytes available to us on the filesystem holding folder
+        """
+        if hasattr(os, "statvfs"):
+            st = os.statvfs(folder)
+            return st.f_bavail * st.f_frsize
+
+        # Windows has no statvfs
+        return shutil.disk_usage(folder).free
+
+    @staticmethod
+    def same_device(src: Path, dst_dir: Path) -> bool:
+        return os.stat(src).st_dev == os.stat(dst_dir).st_dev
+
+    def reserve(self, dst_dir: Path, size: int) -> bool:
+        """
+        Reserve size bytes on dst_dir's filesystem.
+        Return False if it doesn't fit right now.
+        Raise OSError if it can never fit, so it isn't deferred forever.
+        """
+        device = os.stat(dst_dir).st_dev
+
+        if size > shutil.disk_usage(dst_dir).total - self.headroom:
+            raise OSError(
+                errno.ENOSPC, f"{size} bytes will never fit on drive", str(dst_dir)
+            )
+
+        with self.lock:
+            in_flight = self.reserved.get(device, 0)
+            available = self.free_bytes(dst_dir) - in_flight - self.headroom
+
+            if size > available:
+                return False
+
+            self.reserved[device] = in_flight + size
+            return True
+
+    def release(self, dst_dir: Path, size: int):
+        device = os.stat(dst_dir).st_dev
+
+        with self.lock:
+            remaining = self.reserved.get(device, 0) - size
+            if remaining > 0:
+                self.reserved[device] = remaining
+            else:
+                self.reserved.pop(device, None)
+
+
+def preallocated_copy(src: Path, dst: Path, throttle=None):
+    """
+    Copy src to dst, preallocating dst first so the data lands contiguous
+    and a full disk fails before any data is written.
+    throttle: optional callable(nbytes) called per chunk to limit bandwidth
+    """
+    size = src.stat().st_size
+
+    try:
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            if size and hasattr(os, "posix_fallocate"):
+                os.posix_fallocate(fdst.fileno(), 0, size)
+            while chunk := fsrc.read(1024 * 1024):
+                fdst.write(chunk)
+                if throttle:
+                    throttle(len(chunk))
+        shutil.copystat(src, dst)
+    except BaseException:
+        # Never leave a partial file behind
+        dst.unlink(missing_ok=True)
+        raise
@@ -0,0 +1,257 @@
+import os
+import re
+import sqlite3
+import argparse
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+# Names safe_move gives episodes: "Show - S01E02.mkv" (or "..._1.mkv")
+EPISODE_NAME = re.compile(r"^(.*) - S(\d+)E(\d+)(?:_\d+)?$")
+
+# Top-level folders FolderMaker owns; nothing else under the root is indexed
+CATEGORY_ROOTS = ("anime", "movie", "web_series")
+
+# Category dirs sit 2 levels deep (anime/video, movie/hollywood),
+# title dirs at 3 -> one scan job per title dir
+SCAN_SPLIT_DEPTH = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    path TEXT PRIMARY KEY,
+    title TEXT NOT NULL COLLATE NOCASE,
+    season INTEGER,
+    episode INTEGER,
+    category TEXT NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_lookup ON entries (title, season, episode);
+"""
+
+
+class LibraryIndex:
+    """
+    SQLite index of everything placed under the destination folder,
+    so lookups don't have to walk the tree.
+    """
+
+    def __init__(self, root, db_path=None):
+        self.root = Path(root)
+        self.db_path = Path(db_path) if db_path else self.root / ".library.db"
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def parse_entry(self, path: Path, size: int) -> tuple | None:
+        """
+        Return: (path, title, season, episode, category, size) or None
+        if path isn't a library entry
+        """
+        try:
+            parts = path.relative_to(self.root).parts
+        except ValueError:
+            return None
+
+        if not parts or parts[0] not in CATEGORY_ROOTS:
+            return None
+        is_movie_dir = parts[0] == "movie" or parts[:2] == ("anime", "movie")
+
+        match = EPISODE_NAME.match(path.stem)
+        if match and len(parts) >= 4 and not is_movie_dir:
+            # anime/video/<show>/Season N/<show> - SxxEyy.ext
+            title = match.group(1)
+            season, episode = int(match.group(2)), int(match.group(3))
+            category = "/".join(parts[:-3])
+        elif is_movie_dir and len(parts) == 4:
+            # movie/<kind>/<title>/<title>.ext, anime/movie/<title>/<title>.ext
+            title, season, episode = parts[-2], None, None
+            category = "/".join(parts[:-2])
+        else:
+            return None
+
+        return (str(path), title, season, episode, category, size)
+
+    # =====================
+    # UPDATES
+    # =====================
+    def add(self, path: Path):
+        """
+        Record one placed file (called after every safe_move)
+        """
+        row = self.parse_entry(Path(path), Path(path).stat().st_size)
+        if row is None:
+            return
+
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)", row
+            )
+
+    def rebuild(self, workers: int = 8) -> int:
+        """
+        Re-scan the category folders in parallel and replace the index.
+        Return: number of entries
+        """
+        jobs = []
+        rows = []
+        for category in CATEGORY_ROOTS:
+            self.split_scan(self.root / category, 1, jobs, rows)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for result in pool.map(self.scan_tree, jobs):
+                rows.extend(result)
+
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM entries")
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+
+        return len(rows)
+
+    def split_scan(self, folder: Path, depth: int, jobs: list, rows: list):
+        """
+        Collect dirs at SCAN_SPLIT_DEPTH as scan jobs, index shallower files here
+        """
+        try:
+            entries = list(os.scandir(folder))
+        except OSError:
+            return
+
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                if depth + 1 >= SCAN_SPLIT_DEPTH:
+                    jobs.append(Path(entry.path))
+                else:
+                    self.split_scan(Path(entry.path), depth + 1, jobs, rows)
+            elif entry.is_file():
+                row = self.row_for(entry)
+                if row:
+                    rows.append(row)
+
+    def scan_tree(self, folder: Path) -> list:
+        rows = []
+        stack = [folder]
+
+        while stack:
+            try:
+                entries = list(os.scandir(stack.pop()))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(Path(entry.path))
+                elif entry.is_file():
+                    row = self.row_for(entry)
+                    if row:
+                        rows.append(row)
+
+        return rows
+
+    def row_for(self, entry: os.DirEntry) -> tuple | None:
+        # Skip in-progress copies from safe_move
+        if entry.name.endswith(".part"):
+            return None
+        return self.parse_entry(Path(entry.path), entry.stat().st_size)
+
+    # =====================
+    # QUERIES
+    # =====================
+    def query(self, sql: str, params: tuple = ()) -> list:
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def has_episode(self, title: str, season: int, episode: int) -> bool:
+        return bool(
+            self.query(
+                "SELECT 1 FROM entries WHERE title = ? AND season = ? AND episode = ?"
+                " LIMIT 1",
+                (title, season, episode),
+            )
+        )
+
+    def has_movie(self, title: str) -> bool:
+        return bool(
+            self.query(
+                "SELECT 1 FROM entries WHERE title = ? AND season IS NULL LIMIT 1",
+                (title,),
+            )
+        )
+
+    def episodes(self, title: str, season: int) -> list[int]:
+        rows = self.query(
+            "SELECT DISTINCT episode FROM entries WHERE title = ? AND season = ?"
+            " ORDER BY episode",
+            (title, season),
+        )
+        return [r[0] for r in rows]
+
+    def missing_episodes(self, title: str, season: int) -> list[int]:
+        """
+        Gaps between episode 1 and the highest episode we have
+        """
+        have = set(self.episodes(title, season))
+        if not have:
+            return []
+        return [e for e in range(1, max(have) + 1) if e not in have]
+
+    def find(self, text: str) -> list:
+        """
+        Return: [(title, season, episode, category, size, path)] matching text
+        """
+        return self.query(
+            "SELECT title, season, episode, category, size, path FROM entries"
+            " WHERE title LIKE ? ORDER BY title, season, episode",
+            (f"%{text}%",),
+        )
+
+
+# =====================
+# CLI
+# =====================
+def main():
+    parser = argparse.ArgumentParser(description="Query the organized library")
+    parser.add_argument("destination", help="Destination folder of the organizer")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser("rebuild", help="Re-scan the library tree")
+    rebuild.add_argument("--workers", type=int, default=8)
+
+    find = commands.add_parser("find", help="List entries whose title contains TEXT")
+    find.add_argument("text")
+
+    has = commands.add_parser("has", help="Check for one episode")
+    has.add_argument("title")
+    has.add_argument("season", type=int)
+    has.add_argument("episode", type=int)
+
+    missing = commands.add_parser("missing", help="Missing episodes of a season")
+    missing.add_argument("title")
+    missing.add_argument("season", type=int)
+
+    args = parser.parse_args()
+    index = LibraryIndex(args.destination)
+
+    if args.command == "rebuild":
+        print(f"[INDEX] {index.rebuild(args.workers)} entries")
+    elif args.command == "find":
+        for title, season, episode, category, size, path in index.find(args.text):
+            tag = f"S{season:02d}E{episode:02d}" if season is not None else "movie"
+            print(f"{title} {tag} [{category}] {size / 1024**3:.2f} GB  {path}")
+    elif args.command == "has":
+        found = index.has_episode(args.title, args.season, args.episode)
+        print("yes" if found else "no")
+        raise SystemExit(0 if found else 1)
+    elif args.command == "missing":
+        print(" ".join(map(str, index.missing_episodes(args.title, args.season))))
+
+
+if __name__ == "__main__":
+    main()
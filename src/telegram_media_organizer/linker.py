@@ -0,0 +1,96 @@
+import os
+import json
+import threading
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# ioctl to share extents between files (btrfs, XFS)
+FICLONE = 0x40049409
+
+
+def reflink(src: Path, dst: Path) -> bool:
+    """
+    Clone src into dst without copying data. Return False if unsupported.
+    """
+    if fcntl is None:
+        return False
+
+    try:
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        return True
+    except OSError:
+        dst.unlink(missing_ok=True)
+        return False
+
+
+def link_or_clone(src: Path, dst: Path) -> str | None:
+    """
+    Place dst as a hardlink, else a reflink of src.
+    Return: 'hardlink', 'reflink' or None if neither works here
+    """
+    try:
+        os.link(src, dst)
+        return "hardlink"
+    except OSError:
+        # Other filesystem, or one without hardlinks
+        pass
+
+    if reflink(src, dst):
+        return "reflink"
+
+    return None
+
+
+class LinkRegistry:
+    """
+    Persistent record of source files already placed in the library,
+    so link mode doesn't process them again after a restart.
+    """
+
+    def __init__(self, registry_file: Path):
+        self.registry_file = Path(registry_file)
+        self.lock = threading.Lock()
+
+        # State: source path -> {"dst": library path, "identity": [ino, size, mtime]}
+        self.linked = {}
+        if self.registry_file.exists():
+            try:
+                self.linked = json.loads(self.registry_file.read_text("utf-8"))
+            except (OSError, ValueError) as e:
+                print(f"[LINKER] Could not read {self.registry_file}: {e}")
+
+    @staticmethod
+    def identity(src: Path) -> list:
+        """
+        Telegram reuses file names -> a path alone doesn't identify a download
+        """
+        st = os.stat(src)
+        return [st.st_ino, st.st_size, st.st_mtime_ns]
+
+    def __contains__(self, src: Path) -> bool:
+        entry = self.linked.get(str(src))
+        if not isinstance(entry, dict):
+            return False
+
+        try:
+            return entry["identity"] == self.identity(src)
+        except OSError:
+            return False
+
+    def add(self, src: Path, dst: Path):
+        identity = self.identity(src)
+
+        with self.lock:
+            self.linked[str(src)] = {"dst": str(dst), "identity": identity}
+            self.save()
+
+    def save(self):
+        self.registry_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.registry_file.with_name(self.registry_file.name + ".tmp")
+        tmp.write_text(json.dumps(self.linked, indent=2), encoding="utf-8")
+        os.replace(tmp, self.registry_file)
@@ -1,13 +1,37 @@
 import re
 import os
 from pathlib import Path
-import shutil
 from telegram_media_organizer.classifers import MovieClassifierTMDb, AnimeClassifier
+from telegram_media_organizer.admission import SpaceAdmission, preallocated_copy
+from telegram_media_organizer.probe import probe_media
+from telegram_media_organizer.linker import LinkRegistry, link_or_clone
+from telegram_media_organizer.throttle import CopyThrottle
+from telegram_media_organizer.library_index import LibraryIndex
+
+# Anything this long is a movie, even if the title looks like "Name - 2"
+MOVIE_MIN_DURATION = 70 * 60
+
+# Seconds two files' durations may differ and still count as the same video
+DURATION_TOLERANCE = 2
 
 
 class FolderMaker:
-    def __init__(self, destination_folder):
+    def __init__(
+        self,
+        destination_folder,
+        mode: str = "move",
+        throttle: CopyThrottle | None = None,
+    ):
+        """
+        mode: 'move' takes files out of the download folder,
+        'link' leaves them there and places hardlinks/reflinks in the library
+        throttle: bandwidth limits for cross-drive copies
+        """
+        if mode not in ("move", "link"):
+            raise ValueError(f"Invalid mode: {mode}")
+
         self.destination_folder = Path(destination_folder)
+        self.mode = mode
 
         self.anime_folder = self.destination_folder / "anime" / "video"
         self.anime_movie_folder = self.destination_folder / "anime" / "movie"
@@ -17,21 +41,48 @@ class FolderMaker:
         self.movie_classifier = MovieClassifierTMDb()
         self.anime_classifier = AnimeClassifier()
 
-    def detect_media_type(self, title):
+        self.admission = SpaceAdmission()
+        self.throttle = throttle or CopyThrottle()
+        self.links = LinkRegistry(self.destination_folder / ".linked_sources.json")
+        self.index = LibraryIndex(self.destination_folder)
+
+    def is_linked(self, src: Path) -> bool:
+        return self.mode == "link" and src in self.links
+
+    def in_library(self, title: str, media_type: str) -> bool:
+        """
+        Check the library index (no filesystem walk) for this title
+        """
+        if media_type != "tv":
+            return self.index.has_movie(title)
+
+        try:
+            show_name, season, episode = self.parse_tv_title(title)
+        except ValueError:
+            return False
+        return self.index.has_episode(show_name, season, episode)
+
+    def detect_media_type(self, title, duration: float | None = None):
         """
         Reuturn : 'Tv' or 'movie'
+        duration (seconds, from the media probe) settles episode-only titles
         """
         tv_patterns = [
             r"S\d+\s*E\d+",  # S01E01
             r"S\d+\s*-\s*\d+",  # S01 - 01
             r"S\d+\s+\d+",  # S1 01  ← YOUR CASE
-            r"\bEP?\s*\d+\b",  # EP01 / E01
         ]
 
         for pattern in tv_patterns:
             if re.search(pattern, title, re.IGNORECASE):
                 return "tv"
 
+        # EP01 / E01 -> weak hint, a sequel number looks the same
+        if re.search(r"\bEP?\s*\d+\b", title, re.IGNORECASE):
+            if duration is not None and duration >= MOVIE_MIN_DURATION:
+                return "movie"
+            return "tv"
+
         return "movie"
 
     @staticmethod
@@ -89,13 +140,105 @@ class FolderMaker:
         return season_dir / new_name
 
     @staticmethod
-    def safe_move(src: Path, dst: Path):
-        counter = 1
-        final_dst = dst
+    def resolution(media: dict | None) -> int | None:
+        if not media or not media["width"] or not media["height"]:
+            return None
+        return media["width"] * media["height"]
+
+    @staticmethod
+    def same_video(a: dict | None, b: dict | None) -> bool:
+        """
+        Same content in another release? Durations must be known and match.
+        """
+        if not a or not b or a["duration"] is None or b["duration"] is None:
+            return False
+        return abs(a["duration"] - b["duration"]) <= DURATION_TOLERANCE
 
-        while final_dst.exists():
-            final_dst = dst.with_stem(f"{dst.stem}_{counter}")
-            counter += 1
+    def safe_move(self, src: Path, dst: Path, media: dict | None = None):
+        """
+        Move src to dst without overwriting.
+        If dst exists, is the same video (matching duration) and both resolutions
+        are known, keep the higher one. Otherwise keep both (_1, _2, ...).
+        Return the final path, or None if dst's drive has no room yet (deferred).
+        """
+        final_dst = dst
 
-        shutil.move(str(src), str(final_dst))
+        if dst.exists():
+            new_media = media or probe_media(src)
+            old_media = probe_media(dst)
+            new_res = old_res = None
+            if self.same_video(new_media, old_media):
+                new_res = self.resolution(new_media)
+                old_res = self.resolution(old_media)
+
+            if new_res and old_res and new_res < old_res:
+                if self.mode == "link":
+                    self.links.add(src, dst)
+                else:
+                    src.unlink()
+                print(f"[DUPLICATE] Kept higher resolution {dst.name}, dropped {src.name}")
+                return dst
+
+            if not (new_res and old_res and new_res > old_res):
+                counter = 1
+                while final_dst.exists():
+                    final_dst = dst.with_stem(f"{dst.stem}_{counter}")
+                    counter += 1
+
+        if self.mode == "link":
+            return self.link_into_place(src, final_dst)
+
+        # Same drive -> rename, needs no extra space
+        if self.admission.same_device(src, final_dst.parent):
+            os.replace(src, final_dst)
+            self.index.add(final_dst)
+            print(f"[MOVED] {src.name} → {final_dst.name}")
+            return final_dst
+
+        size = src.stat().st_size
+        if not self.admission.reserve(final_dst.parent, size):
+            print(f"[DEFERRED] Not enough space for {src.name} ({size} bytes)")
+            return None
+
+        # Copy beside the target, then swap in -> a failed copy never clobbers dst
+        part = final_dst.with_name(final_dst.name + ".part")
+        limiter = self.throttle.limiter(final_dst.parent)
+        try:
+            preallocated_copy(src, part, limiter)
+            os.replace(part, final_dst)
+            src.unlink()
+        finally:
+            self.admission.release(final_dst.parent, size)
+
+        self.index.add(final_dst)
         print(f"[MOVED] {src.name} → {final_dst.name}")
+        return final_dst
+
+    def link_into_place(self, src: Path, final_dst: Path):
+        """
+        Place src at final_dst, leaving src where it is.
+        Hardlink or reflink when possible, copy only as a last resort.
+        Return the final path, or None if the copy has no room yet (deferred).
+        """
+        part = final_dst.with_name(final_dst.name + ".part")
+        part.unlink(missing_ok=True)
+
+        method = link_or_clone(src, part)
+
+        if method is None:
+            size = src.stat().st_size
+            if not self.admission.reserve(final_dst.parent, size):
+                print(f"[DEFERRED] Not enough space for {src.name} ({size} bytes)")
+                return None
+            limiter = self.throttle.limiter(final_dst.parent)
+            try:
+                preallocated_copy(src, part, limiter)
+            finally:
+                self.admission.release(final_dst.parent, size)
+            method = "copy"
+
+        os.replace(part, final_dst)
+        self.links.add(src, final_dst)
+        self.index.add(final_dst)
+        print(f"[LINKED] ({method}) {src.name} → {final_dst.name}")
+        return final_dst
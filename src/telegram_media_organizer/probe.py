@@ -0,0 +1,310 @@
+import struct
+from pathlib import Path
+
+
+# =====================
+# MEDIA PROBE
+# =====================
+# Reads container headers only (a few KB, with seeks over payloads),
+# so probing a multi-GB file costs about as much as probing a small one.
+
+# Matroska / WebM element IDs
+EBML_HEADER = 0x1A45DFA3
+SEGMENT = 0x18538067
+CLUSTER = 0x1F43B675
+INFO = 0x1549A966
+TIMECODE_SCALE = 0x2AD7B1
+DURATION = 0x4489
+TRACKS = 0x1654AE6B
+TRACK_ENTRY = 0xAE
+TRACK_TYPE = 0x83
+CODEC_ID = 0x86
+VIDEO = 0xE0
+PIXEL_WIDTH = 0xB0
+PIXEL_HEIGHT = 0xBA
+
+# MP4 boxes we descend into
+MP4_CONTAINERS = {b"moov", b"trak", b"mdia", b"minf", b"stbl"}
+
+TS_PACKET = 188
+
+
+def probe_media(file_path: Path) -> dict | None:
+    """
+    Return {"container", "duration", "width", "height", "codec"} or None
+    if the file isn't a recognised video container.
+    duration is in seconds; any field may be None if the header lacks it.
+    """
+    try:
+        with open(file_path, "rb") as f:
+            head = f.read(12)
+            f.seek(0)
+
+            if head[:4] == struct.pack(">I", EBML_HEADER):
+                return probe_matroska(f)
+            if head[4:8] in (b"ftyp", b"moov", b"free", b"mdat", b"wide"):
+                return probe_mp4(f)
+            if is_mpeg_ts(f):
+                return new_info("mpegts")
+    except (OSError, struct.error, ValueError):
+        pass
+
+    return None
+
+
+def new_info(container: str) -> dict:
+    return {
+        "container": container,
+        "duration": None,
+        "width": None,
+        "height": None,
+        "codec": None,
+    }
+
+
+def is_mpeg_ts(f) -> bool:
+    """
+    MPEG-TS has a 0x47 sync byte at the start of every 188-byte packet
+    """
+    data = f.read(TS_PACKET * 3)
+    if len(data) < TS_PACKET * 3:
+        return False
+    return all(data[i * TS_PACKET] == 0x47 for i in range(3))
+
+
+# =====================
+# MATROSKA
+# =====================
+def read_vint(f, keep_marker: bool = False) -> tuple[int, int]:
+    """
+    Read an EBML variable-length integer.
+    Return: value, length in bytes
+    """
+    first = f.read(1)
+    if not first:
+        raise ValueError("Unexpected end of file")
+
+    b = first[0]
+    length = 1
+    mask = 0x80
+    while length <= 8 and not b & mask:
+        mask >>= 1
+        length += 1
+    if length > 8:
+        raise ValueError("Invalid EBML vint")
+
+    value = b if keep_marker else b & (mask - 1)
+    for byte in f.read(length - 1):
+        value = (value << 8) | byte
+
+    return value, length
+
+
+def read_element_header(f) -> tuple[int, int]:
+    """
+    Return: element_id, data_size (-1 when size is unknown)
+    """
+    element_id, _ = read_vint(f, keep_marker=True)
+    size, length = read_vint(f)
+    if size == (1 << (7 * length)) - 1:
+        size = -1
+    return element_id, size
+
+
+def read_uint(f, size: int) -> int:
+    return int.from_bytes(f.read(size), "big")
+
+
+def read_float(f, size: int) -> float:
+    data = f.read(size)
+    return struct.unpack(">f" if size == 4 else ">d", data)[0]
+
+
+def probe_matroska(f) -> dict | None:
+    info = new_info("matroska")
+    end = f.seek(0, 2)
+    f.seek(0)
+
+    element_id, size = read_element_header(f)
+    if element_id != EBML_HEADER:
+        return None
+    f.seek(size, 1)
+
+    element_id, size = read_element_header(f)
+    if element_id != SEGMENT:
+        return None
+    segment_end = end if size < 0 else min(end, f.tell() + size)
+
+    scale = 1_000_000  # Default TimecodeScale: 1ms in ns
+    raw_duration = None
+    found_tracks = False
+
+    while f.tell() < segment_end:
+        element_id, size = read_element_header(f)
+        if size < 0 or element_id == CLUSTER:
+            # Media data starts here, headers are done
+            break
+        child_end = f.tell() + size
+
+        if element_id == INFO:
+            while f.tell() < child_end:
+                sub_id, sub_size = read_element_header(f)
+                if sub_id == TIMECODE_SCALE:
+                    scale = read_uint(f, sub_size)
+                elif sub_id == DURATION:
+                    raw_duration = read_float(f, sub_size)
+                else:
+                    f.seek(sub_size, 1)
+
+        elif element_id == TRACKS:
+            read_matroska_tracks(f, child_end, info)
+            found_tracks = True
+
+        f.seek(child_end)
+        if found_tracks and raw_duration is not None:
+            break
+
+    if raw_duration is not None:
+        info["duration"] = raw_duration * scale / 1e9
+
+    return info
+
+
+def read_matroska_tracks(f, tracks_end: int, info: dict):
+    """
+    Fill width/height/codec from the first video track
+    """
+    while f.tell() < tracks_end:
+        element_id, size = read_element_header(f)
+        entry_end = f.tell() + size
+
+        if element_id != TRACK_ENTRY:
+            f.seek(entry_end)
+            continue
+
+        track_type = None
+        codec = None
+        width = height = None
+
+        while f.tell() < entry_end:
+            sub_id, sub_size = read_element_header(f)
+            if sub_id == TRACK_TYPE:
+                track_type = read_uint(f, sub_size)
+            elif sub_id == CODEC_ID:
+                codec = f.read(sub_size).decode("ascii", "replace").rstrip("\0")
+            elif sub_id == VIDEO:
+                video_end = f.tell() + sub_size
+                while f.tell() < video_end:
+                    v_id, v_size = read_element_header(f)
+                    if v_id == PIXEL_WIDTH:
+                        width = read_uint(f, v_size)
+                    elif v_id == PIXEL_HEIGHT:
+                        height = read_uint(f, v_size)
+                    else:
+                        f.seek(v_size, 1)
+            else:
+                f.seek(sub_size, 1)
+
+        f.seek(entry_end)
+
+        if track_type == 1:  # Video
+            info["codec"] = codec
+            info["width"] = width
+            info["height"] = height
+            return
+
+
+# =====================
+# MP4 / MOV
+# =====================
+def iter_boxes(f, start: int, end: int):
+    """
+    Yield (box_type, payload_start, box_end) for boxes in [start, end)
+    """
+    pos = start
+    while pos + 8 <= end:
+        f.seek(pos)
+        header = f.read(8)
+        if len(header) < 8:
+            return
+        size, box_type = struct.unpack(">I4s", header)
+        payload = pos + 8
+
+        if size == 1:  # 64-bit size follows
+            size = struct.unpack(">Q", f.read(8))[0]
+            payload += 8
+        elif size == 0:  # Box runs to end of file
+            size = end - pos
+
+        if size < payload - pos:
+            return
+
+        yield box_type, payload, pos + size
+        pos += size
+
+
+def probe_mp4(f) -> dict | None:
+    info = new_info("mp4")
+    end = f.seek(0, 2)
+
+    for box_type, payload, box_end in iter_boxes(f, 0, end):
+        if box_type == b"moov":
+            read_mp4_moov(f, payload, box_end, info)
+            return info
+
+    # No moov: an unfinished download or not really an MP4
+    return None
+
+
+def read_mp4_moov(f, start: int, end: int, info: dict):
+    for box_type, payload, box_end in iter_boxes(f, start, end):
+        if box_type == b"mvhd":
+            f.seek(payload)
+            version = f.read(1)[0]
+            if version == 1:
+                f.seek(payload + 20)
+                timescale, duration = struct.unpack(">IQ", f.read(12))
+            else:
+                f.seek(payload + 12)
+                timescale, duration = struct.unpack(">II", f.read(8))
+            if timescale:
+                info["duration"] = duration / timescale
+
+        elif box_type == b"trak" and info["codec"] is None:
+            read_mp4_trak(f, payload, box_end, info)
+
+
+def read_mp4_trak(f, start: int, end: int, info: dict):
+    """
+    Fill width/height/codec if this is a video track
+    """
+    width = height = None
+    is_video = False
+    codec = None
+
+    stack = [(start, end)]
+    while stack:
+        box_start, box_end = stack.pop()
+        for box_type, payload, child_end in iter_boxes(f, box_start, box_end):
+            if box_type in MP4_CONTAINERS:
+                stack.append((payload, child_end))
+
+            elif box_type == b"tkhd":
+                # Width/height are the last 8 bytes, 16.16 fixed point
+                f.seek(child_end - 8)
+                w, h = struct.unpack(">II", f.read(8))
+                width, height = w >> 16, h >> 16
+
+            elif box_type == b"hdlr":
+                f.seek(payload + 8)
+                is_video = f.read(4) == b"vide"
+
+            elif box_type == b"stsd":
+                # First sample entry: size(4) + format(4)
+                f.seek(payload + 8 + 4)
+                codec = f.read(4).decode("ascii", "replace")
+
+    if is_video:
+        info["codec"] = codec
+        info["width"] = width
+        info["height"] = height
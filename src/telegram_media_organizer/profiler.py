@@ -0,0 +1,149 @@
+import sys
+import time
+import signal
+import threading
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+
+class StackProfiler:
+    """
+    On-demand wall-clock stack sampler with tracemalloc snapshots.
+    Turned on at runtime by SIGUSR1 or by creating the control file;
+    samples are tagged by thread name, i.e. the pipeline stage.
+    """
+
+    def __init__(
+        self,
+        report_dir: str = "profiles",
+        control_file: str | None = None,
+        window: int = 30,
+        interval: float = 0.01,
+        top: int = 25,
+    ):
+        self.report_dir = Path(report_dir)
+        self.control_file = Path(control_file) if control_file else None
+        self.window = window  # Default seconds per capture
+        self.interval = interval  # Seconds between stack samples
+        self.top = top  # Lines per section in the report
+
+        self.active = False
+        self.lock = threading.Lock()
+
+    def install(self):
+        """
+        Register the triggers. Must be called from the main thread.
+        """
+        if hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, lambda signum, frame: self.trigger())
+
+        if self.control_file:
+            threading.Thread(
+                target=self.watch_control_file, name="profiler", daemon=True
+            ).start()
+
+    def watch_control_file(self, interval: int = 2):
+        """
+        Start a capture when the control file appears.
+        Its content may hold the window length in seconds.
+        """
+        while True:
+            try:
+                if self.control_file.exists():
+                    text = self.control_file.read_text().strip()
+                    self.control_file.unlink()
+                    self.trigger(int(text) if text.isdigit() else None)
+            except Exception as e:
+                print(f"[PROFILER] Error: {e}")
+            time.sleep(interval)
+
+    def trigger(self, window: int | None = None):
+        with self.lock:
+            if self.active:
+                return
+            self.active = True
+
+        threading.Thread(
+            target=self.capture,
+            args=(window or self.window,),
+            name="profiler-capture",
+            daemon=True,
+        ).start()
+
+    def capture(self, window: int):
+        print(f"[PROFILER] Capturing for {window}s")
+
+        own_tracemalloc = not tracemalloc.is_tracing()
+        if own_tracemalloc:
+            tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+
+        # stage -> Counter of frames seen on top of stack / anywhere in stack
+        leaf = {}
+        cumulative = {}
+        samples = Counter()
+
+        try:
+            deadline = time.monotonic() + window
+
+            while time.monotonic() < deadline:
+                names = {t.ident: t.name for t in threading.enumerate()}
+
+                for ident, frame in sys._current_frames().items():
+                    stage = names.get(ident, str(ident))
+                    if stage.startswith("profiler"):
+                        continue
+                    samples[stage] += 1
+
+                    seen = set()
+                    top_frame = True
+                    while frame is not None:
+                        code = frame.f_code
+                        key = f"{code.co_name} ({code.co_filename}:{frame.f_lineno})"
+                        if top_frame:
+                            leaf.setdefault(stage, Counter())[key] += 1
+                            top_frame = False
+                        func = f"{code.co_name} ({code.co_filename})"
+                        if func not in seen:
+                            cumulative.setdefault(stage, Counter())[func] += 1
+                            seen.add(func)
+                        frame = frame.f_back
+
+                time.sleep(self.interval)
+
+            after = tracemalloc.take_snapshot()
+            path = self.write_report(window, samples, leaf, cumulative, before, after)
+            print(f"[PROFILER] Report written: {path}")
+
+        except Exception as e:
+            print(f"[PROFILER] Error: {e}")
+        finally:
+            if own_tracemalloc:
+                tracemalloc.stop()
+            with self.lock:
+                self.active = False
+
+    def write_report(self, window, samples, leaf, cumulative, before, after) -> Path:
+        self.report_dir.mkdir(parents=True, exist_ok=True)
+        path = self.report_dir / f"profile-{datetime.now():%Y%m%d-%H%M%S}.txt"
+
+        lines = [f"# Wall-clock samples over {window}s every {self.interval}s", ""]
+
+        for stage, total in samples.most_common():
+            lines.append(f"== {stage} ({total} samples)")
+            lines.append("-- self")
+            for key, count in leaf.get(stage, Counter()).most_common(self.top):
+                lines.append(f"{count / total:7.1%}  {key}")
+            lines.append("-- cumulative")
+            for key, count in cumulative.get(stage, Counter()).most_common(self.top):
+                lines.append(f"{count / total:7.1%}  {key}")
+            lines.append("")
+
+        lines.append("== tracemalloc (growth during window)")
+        for stat in after.compare_to(before, "lineno")[: self.top]:
+            lines.append(str(stat))
+
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        return path
@@ -0,0 +1,133 @@
+import os
+import time
+import threading
+from datetime import datetime
+from pathlib import Path
+
+
+class TokenBucket:
+    """
+    Bytes-per-second limiter. Holds at most one second of burst.
+    """
+
+    def __init__(self):
+        self.tokens = 0.0
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def consume(self, n: int, rate: float):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(rate, self.tokens + (now - self.last) * rate)
+            self.last = now
+            self.tokens -= n
+            debt = -self.tokens
+
+        if debt > 0:
+            time.sleep(debt / rate)
+
+
+class CopyThrottle:
+    """
+    Limit library copy bandwidth so downloads in the watch folder keep their I/O.
+
+    rate: global bytes/s limit (None = unlimited)
+    device_rates: {path on a drive: bytes/s} limit per destination drive
+    windows: [(start_hour, end_hour, bytes/s)] limits for times of day
+    busy_rate: bytes/s while downloads are active in the watch folder
+    """
+
+    def __init__(
+        self,
+        rate: float | None = None,
+        device_rates: dict | None = None,
+        windows: list | None = None,
+        busy_rate: float | None = None,
+        busy_timeout: int = 30,
+    ):
+        self.rate = rate
+        self.device_rates = device_rates or {}
+        self.windows = windows or []
+        self.busy_rate = busy_rate
+        self.busy_timeout = busy_timeout  # Seconds a download counts as active
+
+        # State
+        self.buckets = {}  # st_dev -> TokenBucket
+        self.last_activity = None
+        self.lock = threading.Lock()
+
+    def mark_activity(self):
+        """
+        Called when a download in the watch folder is seen growing
+        """
+        self.last_activity = time.monotonic()
+
+    def downloads_active(self) -> bool:
+        if self.last_activity is None:
+            return False
+        return time.monotonic() - self.last_activity < self.busy_timeout
+
+    def window_rate(self) -> float | None:
+        hour = datetime.now().hour
+        for start, end, rate in self.windows:
+            # Windows may wrap midnight, e.g. (22, 6)
+            if start <= end:
+                inside = start <= hour < end
+            else:
+                inside = hour >= start or hour < end
+            if inside:
+                return rate
+        return None
+
+    def device_rate(self, device: int) -> float | None:
+        for path, rate in self.device_rates.items():
+            try:
+                if os.stat(path).st_dev == device:
+                    return rate
+            except OSError:
+                continue
+        return None
+
+    def rate_for(self, device: int) -> float | None:
+        """
+        Tightest limit that applies right now, None if unlimited
+        """
+        return self.current_rate(self.static_rate(device))
+
+    def current_rate(self, static_rate: float | None) -> float | None:
+        """
+        Combine an already resolved global/device limit (None = no limit)
+        with the time-based ones
+        """
+        limits = [static_rate, self.window_rate()]
+        if self.downloads_active():
+            limits.append(self.busy_rate)
+
+        limits = [r for r in limits if r]
+        return min(limits) if limits else None
+
+    def static_rate(self, device: int) -> float | None:
+        """
+        Limits that don't change during a copy: global and per-device
+        """
+        limits = [r for r in (self.rate, self.device_rate(device)) if r]
+        return min(limits) if limits else None
+
+    def limiter(self, dst_dir: Path):
+        """
+        Return a callable(nbytes) that blocks to keep copies into dst_dir's
+        drive under its limit
+        """
+        device = os.stat(dst_dir).st_dev
+        # Resolved once per copy; only time-based limits are checked per chunk
+        static_rate = self.static_rate(device)
+
+        with self.lock:
+            bucket = self.buckets.setdefault(device, TokenBucket())
+
+        def wait(n: int):
+            rate = self.current_rate(static_rate)
+            if rate:
+                bucket.consume(n, rate)
+
+        return wait
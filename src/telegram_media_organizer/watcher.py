@@ -6,12 +6,26 @@ from queue import Queue, Empty
 import mimetypes
 from telegram_media_organizer.organizer import FolderMaker
 from telegram_media_organizer.cleaner import clean_filename
+from telegram_media_organizer.profiler import StackProfiler
+from telegram_media_organizer.probe import probe_media
+from telegram_media_organizer.throttle import CopyThrottle
 
 
 class DirectoryWatcher:
-    def __init__(self, watch_folder: str, destination_folder: str):
+    def __init__(
+        self,
+        watch_folder: str,
+        destination_folder: str,
+        defer_delay: int = 60,
+        profiler: StackProfiler | None = None,
+        mode: str = "move",
+        throttle: CopyThrottle | None = None,
+        skip_known: bool = False,
+    ):
         self.watch_folder = Path(watch_folder)
-        self.maker = FolderMaker(destination_folder)
+        self.throttle = throttle or CopyThrottle()
+        self.maker = FolderMaker(destination_folder, mode, self.throttle)
+        self.profiler = profiler
 
         # Queues
         self.pending_q = Queue()  # Detected files waiting for stability check
@@ -23,14 +37,28 @@ class DirectoryWatcher:
 
         # Control
         self.running = False
+        self.skip_known = skip_known  # Leave files the library index already has
+        self.defer_delay = defer_delay  # Seconds before retrying a deferred move
 
     def start(self):
         self.running = True
 
+        if self.profiler:
+            self.profiler.install()
+
+        # Thread names tag profiler samples by pipeline stage
         threads = [
-            threading.Thread(target=self.scan_folder, daemon=True),
-            threading.Thread(target=self.wait_until_stable, daemon=True),
-            threading.Thread(target=self.process_ready_files, daemon=True),
+            threading.Thread(
+                target=self.scan_folder, name="scan_folder", daemon=True
+            ),
+            threading.Thread(
+                target=self.wait_until_stable, name="wait_until_stable", daemon=True
+            ),
+            threading.Thread(
+                target=self.process_ready_files,
+                name="process_ready_files",
+                daemon=True,
+            ),
         ]
 
         for t in threads:
@@ -63,6 +91,10 @@ class DirectoryWatcher:
                     if not file_path.is_file():
                         continue
 
+                    # Link mode leaves sources in place -> skip ones already placed
+                    if self.maker.is_linked(file_path):
+                        continue
+
                     with self.lock:
                         if file_path not in self.seen_files:
                             self.seen_files.add(file_path)
@@ -106,6 +138,10 @@ class DirectoryWatcher:
                     else:
                         stable_count = 0
 
+                    # Grew since last sample -> still downloading, slow down copies
+                    if last_seen >= 0 and current_size != last_seen:
+                        self.throttle.mark_activity()
+
                     last_seen = current_size
                     time.sleep(delay)
 
@@ -116,6 +152,11 @@ class DirectoryWatcher:
                 if is_video_file(file_path):
                     self.ready_q.put(file_path)
                     print(f"[STABLE] Ready: {file_path.name}")
+                elif file_path.suffix.lower() in PROBED_EXTENSIONS:
+                    # Header may be incomplete (paused download) -> next scan re-checks
+                    with self.lock:
+                        self.seen_files.discard(file_path)
+                    print(f"[IGNORED] No valid header yet: {file_path.name}")
                 else:
                     print(f"[IGNORED] Not a video: {file_path.name}")
 
@@ -132,23 +173,37 @@ class DirectoryWatcher:
     def process_ready_files(self):
         while self.running:
             try:
-                path = self.ready_q.get(timeout=2)
+                item = self.ready_q.get(timeout=2)
+                path = item[0] if isinstance(item, tuple) else item
 
                 if not path.exists():
                     self.ready_q.task_done()
                     continue
 
-                print(f"[PROCESSING] {path.name}")
+                if isinstance(item, tuple):
+                    # Deferred move -> already classified, only retry the space check
+                    _, target, media = item
+                    print(f"[RETRY] {path.name}")
+                else:
+                    print(f"[PROCESSING] {path.name}")
 
-                title = clean_filename(path)
-                media_type = self.maker.detect_media_type(title)
+                    title = clean_filename(path)
+                    media = probe_media(path)
+                    duration = media["duration"] if media else None
+                    media_type = self.maker.detect_media_type(title, duration)
 
-                if media_type == "tv":
-                    target = self.maker.tv_target_path(path, title)
-                else:
-                    target = self.maker.movie_target_path(path, title)
+                    if self.skip_known and self.maker.in_library(title, media_type):
+                        print(f"[SKIPPED] Already in library: {path.name}")
+                        self.ready_q.task_done()
+                        continue
 
-                self.maker.safe_move(path, target)
+                    if media_type == "tv":
+                        target = self.maker.tv_target_path(path, title)
+                    else:
+                        target = self.maker.movie_target_path(path, title)
+
+                if self.maker.safe_move(path, target, media) is None:
+                    self.defer(path, target, media)
                 self.ready_q.task_done()
 
             except Empty:
@@ -156,10 +211,25 @@ class DirectoryWatcher:
             except Exception as e:
                 print(f"[PROCESSOR] Error: {e}")
 
+    def defer(self, path: Path, target: Path, media: dict | None):
+        """
+        Re-queue a file whose destination drive is full, after defer_delay.
+        The target and probe result travel with it so a retry skips classification.
+        """
+        timer = threading.Timer(
+            self.defer_delay, self.ready_q.put, args=((path, target, media),)
+        )
+        timer.daemon = True
+        timer.start()
+
 
 # =====================
 # FILE TYPE CHECKER
 # =====================
+# Containers whose headers we can verify
+PROBED_EXTENSIONS = {".mp4", ".mkv", ".mov", ".webm", ".ts"}
+
+
 def is_video_file(file_path: Path) -> bool:
     """
     Check if the file is a video file
@@ -180,8 +250,14 @@ def is_video_file(file_path: Path) -> bool:
     if not file_path.exists() or not file_path.is_file():
         return False
 
+    suffix = file_path.suffix.lower()
+
+    # Header probe -> catches renamed partials and non-video .ts files
+    if suffix in PROBED_EXTENSIONS:
+        return probe_media(file_path) is not None
+
     # Extension check -> Fast
-    if file_path.suffix.lower() in VIDEO_EXTENSIONS:
+    if suffix in VIDEO_EXTENSIONS:
         return True
 
     # Mime type checker -> Slow but more accurate
@@ -0,0 +1,9 @@
+import pytest
+
+
+@pytest.fixture
+def maker(tmp_path, monkeypatch):
+    monkeypatch.setenv("TMDB_API_KEY", "test")
+    from telegram_media_organizer.organizer import FolderMaker
+
+    return FolderMaker(tmp_path / "library")
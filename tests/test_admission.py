@@ -0,0 +1,141 @@
+import errno
+from collections import namedtuple
+
+import pytest
+
+from telegram_media_organizer import admission
+from telegram_media_organizer.admission import SpaceAdmission, preallocated_copy
+
+DiskUsage = namedtuple("DiskUsage", "total used free")
+GB = 1024**3
+
+
+@pytest.fixture
+def disk(monkeypatch):
+    """
+    Fake drive: set disk["free"] / disk["total"] in bytes
+    """
+    state = {"free": 100 * GB, "total": 1000 * GB}
+    monkeypatch.setattr(
+        SpaceAdmission, "free_bytes", staticmethod(lambda folder: state["free"])
+    )
+    monkeypatch.setattr(
+        admission.shutil,
+        "disk_usage",
+        lambda folder: DiskUsage(state["total"], 0, state["free"]),
+    )
+    return state
+
+
+def test_reserve_tracks_in_flight_moves(tmp_path, disk):
+    space = SpaceAdmission(headroom=GB)
+    disk["free"] = 10 * GB
+
+    assert space.reserve(tmp_path, 6 * GB)
+    # 10 free - 6 in flight - 1 headroom = 3 left
+    assert not space.reserve(tmp_path, 4 * GB)
+
+    space.release(tmp_path, 6 * GB)
+    assert space.reserve(tmp_path, 4 * GB)
+
+
+def test_reserve_raises_when_it_can_never_fit(tmp_path, disk):
+    space = SpaceAdmission(headroom=GB)
+    disk["total"] = 10 * GB
+
+    with pytest.raises(OSError) as e:
+        space.reserve(tmp_path, 10 * GB)
+
+    assert e.value.errno == errno.ENOSPC
+
+
+def test_safe_move_defers_when_drive_is_full(maker, tmp_path, disk, monkeypatch):
+    monkeypatch.setattr(maker.admission, "same_device", lambda src, dst_dir: False)
+    disk["free"] = 0
+
+    src = tmp_path / "Movie 2020.mkv"
+    src.write_bytes(b"x" * 1024)
+    dst = maker.movie_folder / "other" / "Movie 2020" / "Movie 2020.mkv"
+    dst.parent.mkdir(parents=True)
+
+    assert maker.safe_move(src, dst) is None
+    assert src.exists()
+    assert list(dst.parent.iterdir()) == []
+    assert maker.admission.reserved == {}
+
+
+def test_preallocated_copy_removes_partial_file(tmp_path, monkeypatch):
+    src = tmp_path / "src.mkv"
+    src.write_bytes(b"x" * (3 * 1024 * 1024))
+    dst = tmp_path / "dst.mkv.part"
+
+    class FullDisk:
+        """
+        Writes the first chunk, then fails like a full disk
+        """
+
+        def __init__(self, f):
+            self.f = f
+            self.writes = 0
+
+        def __enter__(self):
+            self.f.__enter__()
+            return self
+
+        def __exit__(self, *exc):
+            return self.f.__exit__(*exc)
+
+        def fileno(self):
+            return self.f.fileno()
+
+        def write(self, data):
+            self.writes += 1
+            if self.writes > 1:
+                raise OSError(errno.ENOSPC, "No space left on device")
+            return self.f.write(data)
+
+    real_open = open
+
+    def fake_open(path, mode="r", *args, **kwargs):
+        f = real_open(path, mode, *args, **kwargs)
+        return FullDisk(f) if "w" in mode else f
+
+    monkeypatch.setattr(admission, "open", fake_open, raising=False)
+
+    with pytest.raises(OSError):
+        preallocated_copy(src, dst)
+
+    assert not dst.exists()
+    assert src.exists()
+
+
+def test_deferred_retry_skips_classification(tmp_path, monkeypatch):
+    monkeypatch.setenv("TMDB_API_KEY", "test")
+    from telegram_media_organizer.watcher import DirectoryWatcher
+
+    watcher = DirectoryWatcher(tmp_path / "downloads", tmp_path / "library")
+    src = tmp_path / "Movie 2020.mkv"
+    src.write_bytes(b"x")
+    target = tmp_path / "library" / "movie" / "other" / "Movie 2020.mkv"
+
+    def no_classify(*args):
+        # The processor swallows exceptions -> stop it so the assert below fails
+        watcher.running = False
+        raise AssertionError("deferred retry must not re-classify")
+
+    moves = []
+
+    def fake_safe_move(path, dst, media):
+        moves.append((path, dst, media))
+        watcher.running = False
+        return dst
+
+    monkeypatch.setattr(watcher.maker, "movie_target_path", no_classify)
+    monkeypatch.setattr(watcher.maker, "tv_target_path", no_classify)
+    monkeypatch.setattr(watcher.maker, "safe_move", fake_safe_move)
+
+    watcher.running = True
+    watcher.ready_q.put((src, target, {"duration": 1.0}))
+    watcher.process_ready_files()
+
+    assert moves == [(src, target, {"duration": 1.0})]
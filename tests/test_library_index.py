@@ -0,0 +1,43 @@
+from telegram_media_organizer.library_index import LibraryIndex
+
+
+def touch(path, data: bytes = b"x"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+
+
+def test_rebuild_indexes_only_category_folders(tmp_path):
+    touch(tmp_path / "anime/video/Monster/Season 1/Monster - S01E02.mkv")
+    touch(tmp_path / "anime/video/Monster/Season 1/Monster - S01E05.mkv")
+    touch(tmp_path / "anime/movie/Akira 1988/Akira 1988.mkv")
+    touch(tmp_path / "movie/hollywood/Arrival 2016/Arrival 2016.mkv")
+    touch(tmp_path / "movie/other/Arrival 2016/Arrival 2016.mkv.part")
+
+    # Watch folder and unrelated files on the same drive
+    touch(tmp_path / "downloads/tg/Some Movie 2020.mkv")
+    touch(tmp_path / "personal/photos/x/img.jpg")
+
+    index = LibraryIndex(tmp_path)
+
+    assert index.rebuild(workers=2) == 4
+    assert index.has_episode("monster", 1, 5)
+    assert index.missing_episodes("Monster", 1) == [1, 3, 4]
+    assert index.has_movie("Akira 1988")
+    assert index.has_movie("Arrival 2016")
+    assert not index.has_movie("tg")
+    assert not index.has_movie("x")
+
+
+def test_add_ignores_paths_outside_category_folders(tmp_path):
+    outside = tmp_path / "downloads/tg/Some Movie 2020.mkv"
+    touch(outside)
+    episode = tmp_path / "anime/video/Monster/Season 1/Monster - S01E02.mkv"
+    touch(episode, b"xyz")
+
+    index = LibraryIndex(tmp_path)
+    index.add(outside)
+    index.add(episode)
+
+    assert index.find("") == [
+        ("Monster", 1, 2, "anime/video", 3, str(episode)),
+    ]
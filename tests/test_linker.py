@@ -0,0 +1,91 @@
+import os
+import time
+import threading
+
+import pytest
+
+from test_probe import make_mkv
+
+
+@pytest.fixture
+def link_maker(tmp_path, monkeypatch):
+    monkeypatch.setenv("TMDB_API_KEY", "test")
+    from telegram_media_organizer.organizer import FolderMaker
+
+    return FolderMaker(tmp_path / "library", mode="link")
+
+
+def episode_target(maker):
+    dst = maker.anime_folder / "Monster" / "Season 1" / "Monster - S01E02.mkv"
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    return dst
+
+
+def download(tmp_path, name: str, data: bytes):
+    src = tmp_path / "downloads" / name
+    src.parent.mkdir(exist_ok=True)
+    src.write_bytes(data)
+    return src
+
+
+def scan_once(watcher):
+    watcher.running = True
+    thread = threading.Thread(target=watcher.scan_folder, args=(0.01,), daemon=True)
+    thread.start()
+    time.sleep(0.2)
+    watcher.running = False
+    thread.join()
+
+    found = []
+    while not watcher.pending_q.empty():
+        found.append(watcher.pending_q.get().name)
+    return found
+
+
+def test_hardlink_placement_keeps_source(link_maker, tmp_path):
+    src = download(tmp_path, "Monster S01E02.mkv", make_mkv())
+    dst = episode_target(link_maker)
+
+    assert link_maker.safe_move(src, dst) == dst
+    assert src.exists()
+    assert os.stat(src).st_nlink == 2
+    assert os.path.samefile(src, dst)
+    assert link_maker.is_linked(src)
+
+
+def test_scanner_skips_registered_source_after_reload(link_maker, tmp_path):
+    from telegram_media_organizer.watcher import DirectoryWatcher
+
+    src = download(tmp_path, "Monster S01E02.mkv", make_mkv())
+    link_maker.safe_move(src, episode_target(link_maker))
+    download(tmp_path, "Other S01E01.mkv", make_mkv())
+
+    # New watcher -> registry is loaded back from .linked_sources.json
+    watcher = DirectoryWatcher(
+        tmp_path / "downloads", tmp_path / "library", mode="link"
+    )
+
+    assert scan_once(watcher) == ["Other S01E01.mkv"]
+
+
+def test_reused_name_is_a_new_download(link_maker, tmp_path):
+    src = download(tmp_path, "Monster S01E02.mkv", make_mkv())
+    link_maker.safe_move(src, episode_target(link_maker))
+
+    # Client deletes the file and later saves a different one under the same name
+    src.unlink()
+    download(tmp_path, "Monster S01E02.mkv", make_mkv(1280, 720, duration_ms=1000.0))
+
+    assert not link_maker.is_linked(src)
+
+
+def test_lower_resolution_duplicate_is_linked_not_deleted(link_maker, tmp_path):
+    existing = make_mkv(1920, 1080)
+    dst = episode_target(link_maker)
+    dst.write_bytes(existing)
+    src = download(tmp_path, "Monster S01E02.mkv", make_mkv(1280, 720))
+
+    assert link_maker.safe_move(src, dst) == dst
+    assert src.exists()
+    assert dst.read_bytes() == existing
+    assert link_maker.is_linked(src)
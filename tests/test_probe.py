@@ -0,0 +1,190 @@
+import struct
+import threading
+
+from telegram_media_organizer.probe import probe_media
+
+
+# =====================
+# SYNTHETIC FILES
+# =====================
+def ebml(element_id: int, data: bytes) -> bytes:
+    id_bytes = element_id.to_bytes((element_id.bit_length() + 7) // 8, "big")
+    # 8-byte size vint: marker 0x01 + 7 bytes of length
+    return id_bytes + b"\x01" + len(data).to_bytes(7, "big") + data
+
+
+def make_mkv(width: int = 1920, height: int = 1080, duration_ms: float = 5400000.0):
+    info = ebml(
+        0x1549A966,
+        ebml(0x2AD7B1, (1_000_000).to_bytes(3, "big"))
+        + ebml(0x4489, struct.pack(">d", duration_ms)),
+    )
+    audio = ebml(0xAE, ebml(0x83, b"\x02") + ebml(0x86, b"A_AAC"))
+    video = ebml(
+        0xAE,
+        ebml(0x83, b"\x01")
+        + ebml(0x86, b"V_MPEG4/ISO/AVC")
+        + ebml(
+            0xE0,
+            ebml(0xB0, width.to_bytes(2, "big"))
+            + ebml(0xBA, height.to_bytes(2, "big")),
+        ),
+    )
+    tracks = ebml(0x1654AE6B, audio + video)
+    cluster = ebml(0x1F43B675, b"\0" * 64)
+
+    # Segment with unknown size, like a live muxer writes it
+    segment_header = bytes.fromhex("18538067") + b"\x01" + b"\xff" * 7
+    segment = segment_header + info + tracks + cluster
+    return ebml(0x1A45DFA3, ebml(0x4282, b"matroska")) + segment
+
+
+def box(box_type: bytes, data: bytes) -> bytes:
+    return struct.pack(">I4s", 8 + len(data), box_type) + data
+
+
+def make_mp4(width: int = 1280, height: int = 720, with_moov: bool = True):
+    mvhd = box(b"mvhd", b"\0" * 12 + struct.pack(">II", 1000, 1440000) + b"\0" * 80)
+    tkhd = box(b"tkhd", b"\0" * 76 + struct.pack(">II", width << 16, height << 16))
+    hdlr = box(b"hdlr", b"\0" * 8 + b"vide" + b"\0" * 12)
+    stsd = box(b"stsd", b"\0" * 8 + box(b"hvc1", b"\0" * 20))
+    stbl = box(b"stbl", stsd)
+    trak = box(b"trak", tkhd + box(b"mdia", hdlr + box(b"minf", stbl)))
+    moov = box(b"moov", mvhd + trak)
+
+    # moov after mdat, as most encoders write it
+    data = box(b"ftyp", b"isom" + b"\0" * 4) + box(b"mdat", b"\0" * 4096)
+    return data + moov if with_moov else data
+
+
+# =====================
+# PROBE
+# =====================
+def test_mp4_moov_after_mdat(tmp_path):
+    path = tmp_path / "a.mp4"
+    path.write_bytes(make_mp4())
+
+    assert probe_media(path) == {
+        "container": "mp4",
+        "duration": 1440.0,
+        "width": 1280,
+        "height": 720,
+        "codec": "hvc1",
+    }
+
+
+def test_mkv_info_and_tracks(tmp_path):
+    path = tmp_path / "a.mkv"
+    path.write_bytes(make_mkv())
+
+    assert probe_media(path) == {
+        "container": "matroska",
+        "duration": 5400.0,
+        "width": 1920,
+        "height": 1080,
+        "codec": "V_MPEG4/ISO/AVC",
+    }
+
+
+def test_truncated_mp4_without_moov(tmp_path):
+    path = tmp_path / "partial.mp4"
+    path.write_bytes(make_mp4(with_moov=False))
+
+    assert probe_media(path) is None
+
+
+def test_non_ts_file_with_ts_extension(tmp_path):
+    path = tmp_path / "typescript.ts"
+    path.write_text("export const x: number = 1;\n" * 50)
+
+    assert probe_media(path) is None
+
+
+def test_mpeg_ts(tmp_path):
+    path = tmp_path / "a.ts"
+    path.write_bytes((b"\x47" + b"\0" * 187) * 4)
+
+    assert probe_media(path)["container"] == "mpegts"
+
+
+# =====================
+# SAFE MOVE COLLISIONS
+# =====================
+def place(maker, tmp_path, existing: bytes, incoming: bytes):
+    dst = maker.anime_folder / "Monster" / "Season 1" / "Monster - S01E02.mkv"
+    dst.parent.mkdir(parents=True)
+    dst.write_bytes(existing)
+
+    src = tmp_path / "Monster S01E02.mkv"
+    src.write_bytes(incoming)
+
+    return src, dst, maker.safe_move(src, dst)
+
+
+def test_safe_move_keeps_existing_higher_resolution(maker, tmp_path):
+    existing = make_mkv(1920, 1080)
+    src, dst, result = place(maker, tmp_path, existing, make_mkv(1280, 720))
+
+    assert result == dst
+    assert not src.exists()
+    assert dst.read_bytes() == existing
+    assert not dst.with_stem(f"{dst.stem}_1").exists()
+
+
+def test_safe_move_replaces_lower_resolution(maker, tmp_path):
+    incoming = make_mkv(1920, 1080)
+    src, dst, result = place(maker, tmp_path, make_mkv(1280, 720), incoming)
+
+    assert result == dst
+    assert not src.exists()
+    assert dst.read_bytes() == incoming
+    assert not dst.with_stem(f"{dst.stem}_1").exists()
+
+
+def test_safe_move_equal_resolution_keeps_both(maker, tmp_path):
+    existing = make_mkv(1920, 1080)
+    incoming = make_mkv(1920, 1080, duration_ms=1000.0)
+    src, dst, result = place(maker, tmp_path, existing, incoming)
+
+    assert result == dst.with_stem(f"{dst.stem}_1")
+    assert dst.read_bytes() == existing
+    assert result.read_bytes() == incoming
+
+
+def test_safe_move_different_durations_keeps_both(maker, tmp_path):
+    # Same cleaned name, different video (e.g. a remake) -> never drop either
+    existing = make_mkv(1920, 1080, duration_ms=5400000.0)
+    incoming = make_mkv(1280, 720, duration_ms=6600000.0)
+    src, dst, result = place(maker, tmp_path, existing, incoming)
+
+    assert result == dst.with_stem(f"{dst.stem}_1")
+    assert dst.read_bytes() == existing
+    assert result.read_bytes() == incoming
+    assert not src.exists()
+
+
+# =====================
+# STABILITY CHECK
+# =====================
+def test_partial_header_is_rechecked_by_later_scan(tmp_path, monkeypatch):
+    monkeypatch.setenv("TMDB_API_KEY", "test")
+    from telegram_media_organizer.watcher import DirectoryWatcher
+
+    watcher = DirectoryWatcher(tmp_path / "downloads", tmp_path / "library")
+    path = tmp_path / "downloads" / "Movie 2020.mp4"
+    path.parent.mkdir()
+    path.write_bytes(make_mp4(with_moov=False))
+
+    watcher.seen_files.add(path)
+    watcher.pending_q.put(path)
+
+    def stop_when_drained():
+        watcher.pending_q.join()
+        watcher.running = False
+
+    watcher.running = True
+    threading.Thread(target=stop_when_drained, daemon=True).start()
+    watcher.wait_until_stable(stable_check=1, delay=0)
+
+    assert path not in watcher.seen_files
+    assert watcher.ready_q.empty()
@@ -0,0 +1,131 @@
+from datetime import datetime
+
+import pytest
+
+from telegram_media_organizer import throttle
+from telegram_media_organizer.throttle import CopyThrottle, TokenBucket
+
+MB = 1024 * 1024
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    Fake monotonic clock; time.sleep advances it and records the wait
+    """
+    state = {"now": 0.0, "slept": 0.0}
+
+    def sleep(seconds):
+        state["now"] += seconds
+        state["slept"] += seconds
+
+    monkeypatch.setattr(throttle.time, "monotonic", lambda: state["now"])
+    monkeypatch.setattr(throttle.time, "sleep", sleep)
+    return state
+
+
+def at_hour(monkeypatch, hour: int):
+    class FakeDatetime:
+        @staticmethod
+        def now():
+            return datetime(2026, 1, 1, hour)
+
+    monkeypatch.setattr(throttle, "datetime", FakeDatetime)
+
+
+def test_token_bucket_holds_rate(clock):
+    bucket = TokenBucket()
+
+    for _ in range(5):
+        bucket.consume(MB, 2 * MB)
+
+    assert clock["slept"] == pytest.approx(2.5)
+
+
+def test_token_bucket_burst_is_capped_at_one_second(clock):
+    bucket = TokenBucket()
+    clock["now"] = 100.0  # Long idle
+
+    bucket.consume(3 * MB, MB)
+
+    # Only 1s of tokens saved up -> 2s of debt
+    assert clock["slept"] == pytest.approx(2.0)
+
+
+@pytest.mark.parametrize(
+    "hour, expected",
+    [(21, None), (22, 5), (23, 5), (0, 5), (5, 5), (6, None), (12, 9), (17, None)],
+)
+def test_window_rate_wraps_midnight(monkeypatch, hour, expected):
+    at_hour(monkeypatch, hour)
+    limits = CopyThrottle(windows=[(22, 6, 5), (9, 17, 9)])
+
+    assert limits.window_rate() == expected
+
+
+def test_busy_timeout(clock):
+    limits = CopyThrottle(busy_rate=3, busy_timeout=30)
+    assert not limits.downloads_active()
+
+    clock["now"] = 100.0
+    limits.mark_activity()
+
+    clock["now"] = 129.9
+    assert limits.downloads_active()
+    clock["now"] = 130.0
+    assert not limits.downloads_active()
+
+
+def test_rate_is_tightest_applicable_limit(tmp_path, monkeypatch, clock):
+    at_hour(monkeypatch, 23)
+    device = tmp_path.stat().st_dev
+    limits = CopyThrottle(
+        rate=10, device_rates={tmp_path: 7}, windows=[(22, 6, 8)], busy_rate=3
+    )
+
+    assert limits.rate_for(device) == 7
+    assert limits.rate_for(device + 1) == 8  # Other drive: no device limit
+
+    limits.mark_activity()
+    assert limits.rate_for(device) == 3
+
+    at_hour(monkeypatch, 12)
+    clock["now"] += 60
+    assert limits.rate_for(device + 1) == 10
+
+
+def test_unlimited_by_default(tmp_path):
+    assert CopyThrottle().rate_for(tmp_path.stat().st_dev) is None
+
+
+def test_limiter_waits_per_chunk(tmp_path, monkeypatch, clock):
+    at_hour(monkeypatch, 12)
+    limits = CopyThrottle(device_rates={tmp_path: MB})
+
+    wait = limits.limiter(tmp_path)
+    for _ in range(4):
+        wait(MB // 2)
+
+    assert clock["slept"] == pytest.approx(2.0)
+
+
+def test_limiter_resolves_device_rate_once(tmp_path, monkeypatch, clock):
+    at_hour(monkeypatch, 12)
+    # Device limit for another drive only -> no static limit for this copy
+    limits = CopyThrottle(device_rates={tmp_path / "missing": MB})
+
+    calls = []
+    device_rate = limits.device_rate
+
+    def counting_device_rate(device):
+        calls.append(device)
+        return device_rate(device)
+
+    monkeypatch.setattr(limits, "device_rate", counting_device_rate)
+
+    wait = limits.limiter(tmp_path)
+    for _ in range(5):
+        wait(MB)
+
+    assert len(calls) == 1
+    assert clock["slept"] == 0